@@ -1,37 +1,152 @@
 import os
 import json
 import uuid
+import re
+import atexit
+import asyncio
+from collections import OrderedDict
+from threading import Lock
 from typing import Optional, Dict
 
+from cachetools import TTLCache
+
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from dotenv import load_dotenv
-from langchain_core.tools import tool
-from datetime import datetime
 import ollama
 
-# Load environment variables
-load_dotenv()
+# Load environment variables. python-dotenv is only imported when a .env
+# file is actually present — checked both in the working directory and
+# next to this module, matching where load_dotenv() itself searches — so
+# the common no-.env case skips the package import entirely. This has to
+# happen before the OLLAMA_* reads below, which configure the
+# module-level clients.
+if os.path.exists(".env") or os.path.exists(os.path.join(os.path.dirname(__file__), ".env")):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Configure Ollama - make sure Ollama server is running on localhost:11434
 # You can change the model here: "mistral", "neural-chat", "llama2", "zephyr"
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+# Keep the model resident between requests so nobody pays the 5-30s
+# model-load penalty after Ollama's idle unload.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# Persistent client so every call reuses one keep-alive connection pool.
+# The module-level ollama.generate() builds a fresh HTTP client per call,
+# paying a new TCP handshake each time.
+_OLLAMA = ollama.Client(host=OLLAMA_HOST)
+atexit.register(_OLLAMA._client.close)
+
+# Async twin of _OLLAMA for the FastAPI path, so independent generations
+# in one turn can overlap instead of running back to back.
+_OLLAMA_ASYNC = ollama.AsyncClient(host=OLLAMA_HOST)
+
+# LRU cache of model responses keyed by the exact prompt. Short repeated
+# inputs ("done", "no", "yes") produce identical prompts, so a hit skips
+# an entire Ollama round-trip. Keys include PROMPT_VERSION so editing a
+# prompt template invalidates stale entries.
+PROMPT_VERSION = "v1"
+_LLM_CACHE_MAXSIZE = 1024
+_llm_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _llm_cache_get(prompt: str, format: Optional[str] = None) -> Optional[str]:
+    key = (PROMPT_VERSION, format, prompt)
+    response = _llm_cache.get(key)
+    if response is not None:
+        _llm_cache.move_to_end(key)
+    return response
+
+
+def _llm_cache_put(prompt: str, response: str, format: Optional[str] = None) -> None:
+    # Don't cache failures (empty responses) — let them retry.
+    if not response:
+        return
+    _llm_cache[(PROMPT_VERSION, format, prompt)] = response
+    if len(_llm_cache) > _LLM_CACHE_MAXSIZE:
+        _llm_cache.popitem(last=False)
+
 
 # Simple wrapper to call Ollama
-def call_ollama(prompt: str) -> str:
+def call_ollama(prompt: str, format: Optional[str] = None) -> str:
     """Call Ollama model with a prompt"""
+    cached = _llm_cache_get(prompt, format)
+    if cached is not None:
+        return cached
+    # Stream and accumulate: Ollama's non-stream path buffers the whole
+    # response server-side and is drastically slower than streaming.
     try:
-        response = ollama.generate(
+        parts = []
+        for chunk in _OLLAMA.generate(
             model=OLLAMA_MODEL,
             prompt=prompt,
-            stream=False,
+            stream=True,
+            format=format,
+            keep_alive=OLLAMA_KEEP_ALIVE,
             options={
                 "temperature": 0.7,
                 "top_p": 0.9,
             }
-        )
-        return response.response if hasattr(response, 'response') else response.get('response', '')
+        ):
+            parts.append(chunk.response if hasattr(chunk, 'response') else chunk.get('response', ''))
+        response = "".join(parts)
+        _llm_cache_put(prompt, response, format)
+        return response
+    except Exception as e:
+        print(f"Error calling Ollama: {e}")
+        return ""
+
+# Single-flight map of generations currently in progress, keyed like the
+# response cache. When several concurrent requests build the identical
+# prompt (e.g. a burst of users typing "done" before the cache warms),
+# one Ollama call serves all of them. Each entry owns a detached task so
+# the shared generation outlives any individual waiter: a client
+# disconnecting mid-generation cancels only its own (shielded) await,
+# not the call the other requests are coalesced onto.
+_inflight: Dict[tuple, "asyncio.Task[str]"] = {}
+
+
+async def call_ollama_async(prompt: str, format: Optional[str] = None) -> str:
+    """Async variant of call_ollama for concurrent generations"""
+    cached = _llm_cache_get(prompt, format)
+    if cached is not None:
+        return cached
+
+    key = (format, prompt)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_run_inflight(prompt, format, key))
+        _inflight[key] = task
+    return await asyncio.shield(task)
+
+
+async def _run_inflight(prompt: str, format: Optional[str], key: tuple) -> str:
+    try:
+        return await _generate_async(prompt, format)
+    finally:
+        _inflight.pop(key, None)
+
+
+async def _generate_async(prompt: str, format: Optional[str]) -> str:
+    try:
+        parts = []
+        async for chunk in await _OLLAMA_ASYNC.generate(
+            model=OLLAMA_MODEL,
+            prompt=prompt,
+            stream=True,
+            format=format,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            options={
+                "temperature": 0.7,
+                "top_p": 0.9,
+            }
+        ):
+            parts.append(chunk.response if hasattr(chunk, 'response') else chunk.get('response', ''))
+        response = "".join(parts)
+        _llm_cache_put(prompt, response, format)
+        return response
     except Exception as e:
         print(f"Error calling Ollama: {e}")
         return ""
@@ -49,12 +164,26 @@ EMPTY_CONTEXT = {
 }
 
 
+# Only these fields are REQUIRED for booking; the rest are optional
+# extras (age, phone, symptoms).
+REQUIRED_FIELDS = ("doctor_specialty", "preferred_date", "preferred_time", "patient_name", "reason")
+
+# Human-readable spellings of the context keys, computed once — the key
+# set is fixed, so there's no reason to re-run replace()/title() per turn.
+_DISPLAY_NAMES = {k: k.replace("_", " ").title() for k in EMPTY_CONTEXT}
+_SPACED_NAMES = {k: k.replace("_", " ") for k in EMPTY_CONTEXT}
+
+
 def new_context() -> Dict[str, Optional[str]]:
-    return {k: None for k in EMPTY_CONTEXT}
+    # Single C-level copy instead of a Python-level loop over the keys.
+    return EMPTY_CONTEXT.copy()
 
 
-# In-memory session store (request/response API conversations)
-session_contexts: Dict[str, Dict[str, Optional[str]]] = {}
+# In-memory session store (request/response API conversations). TTL-bound
+# so idle sessions evict instead of leaking memory for the life of the
+# server; TTLCache isn't thread-safe, so accesses hold _sessions_lock.
+session_contexts: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+_sessions_lock = Lock()
 
 
 # FastAPI app for request/response usage
@@ -66,23 +195,36 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
 
 
+class AppointmentContext(BaseModel):
+    # Mirrors EMPTY_CONTEXT. A fixed-slot model lets Pydantic validate a
+    # known schema instead of walking an arbitrary-keyed Dict[str, str]
+    # on every response.
+    doctor_specialty: Optional[str] = None
+    preferred_date: Optional[str] = None
+    preferred_time: Optional[str] = None
+    patient_name: Optional[str] = None
+    patient_age: Optional[str] = None
+    patient_phone: Optional[str] = None
+    reason: Optional[str] = None
+    symptoms: Optional[str] = None
+
+
 class ChatResponse(BaseModel):
     session_id: str
     status: str
     message: str
-    collected_info: Dict[str, str] = {}
+    collected_info: AppointmentContext = AppointmentContext()
     missing_fields: Optional[list] = None
     questions: Optional[str] = None
-    extracted_info: Optional[Dict[str, str]] = None
+    extracted_info: Optional[AppointmentContext] = None
 
 # ========== CORE LOGIC FUNCTIONS ==========
 
-def extract_appointment_info_logic(user_input: str) -> dict:
-    """
-    Extracts appointment-related information from user input using Ollama.
-    Returns dict with extracted fields.
-    """
-    extraction_prompt = f"""Extract appointment booking information from this user message. Return ONLY valid JSON.
+# Prompt prefixes/suffixes are constant within a process; precompute them
+# once so each call is a single concatenation, and keep the long prefix
+# byte-identical across calls so Ollama's server-side KV cache can reuse
+# the prefix tokens.
+_EXTRACTION_PROMPT_PREFIX = """Extract appointment booking information from this user message. Return ONLY valid JSON.
 
 Instructions:
 - Extract values that are explicitly mentioned
@@ -102,63 +244,111 @@ Fields to extract (all should be present, use null if not mentioned):
 - reason
 - symptoms
 
-User message: "{user_input}"
+User message: \""""
 
-Return ONLY valid JSON, no explanation."""
-    
-    response_text = call_ollama(extraction_prompt)
-    
-    # Remove markdown code blocks if present
-    response_text = response_text.strip()
-    if response_text.startswith("```json"):
-        response_text = response_text[7:]  # Remove ```json
-    if response_text.startswith("```"):
-        response_text = response_text[3:]  # Remove ```
-    if response_text.endswith("```"):
-        response_text = response_text[:-3]  # Remove trailing ```
-    response_text = response_text.strip()
-    
+_EXTRACTION_PROMPT_SUFFIX = "\"\n\nReturn ONLY valid JSON, no explanation."
+
+
+def build_extraction_prompt(user_input: str) -> str:
+    """Builds the extraction prompt for a given user message."""
+    return _EXTRACTION_PROMPT_PREFIX + user_input.replace('"', '\\"') + _EXTRACTION_PROMPT_SUFFIX
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+def parse_extraction_response(response_text: str) -> dict:
+    """Parses the model's extraction response into a dict."""
+    # Decode the first JSON object in the response, ignoring any markdown
+    # fences or prose the model wrapped around it.
+    start = response_text.find("{")
+    if start < 0:
+        print(f"DEBUG: No JSON object in response: {response_text}")
+        return {}
     try:
-        extracted = json.loads(response_text)
+        extracted, _ = _JSON_DECODER.raw_decode(response_text, start)
         return extracted
-    except json.JSONDecodeError as e:
+    except json.JSONDecodeError:
         print(f"DEBUG: Failed to parse JSON from response: {response_text}")
         return {}
 
+def extract_appointment_info_logic(user_input: str) -> dict:
+    """
+    Extracts appointment-related information from user input using Ollama.
+    Returns dict with extracted fields.
+    """
+    fast = classify_trivial_input(user_input)
+    if fast is not None:
+        return fast
+    return parse_extraction_response(call_ollama(build_extraction_prompt(user_input), format="json"))
+
+# Inputs the extraction model would only echo back: acknowledgements and
+# bare dates/times/phone numbers. Handling them here skips the LLM call
+# entirely, which removes a 1-3s round-trip from a large share of turns.
+_TRIVIAL_PATTERNS = re.compile(r"(?:done|no|nope|nothing|that's all|yes|yeah|yep|ok|okay)\.?", re.IGNORECASE)
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_CLOCK_TIME = re.compile(r"\d{1,2}:\d{2}(?:\s?[ap]\.?m\.?)?", re.IGNORECASE)
+_PHONE_NUMBER = re.compile(r"\+?\d[\d\s\-]{8,14}")
+
+def classify_trivial_input(user_input: str) -> Optional[dict]:
+    """
+    Recognizes inputs that can be parsed without the LLM. Returns the
+    extracted fields (possibly empty for plain yes/no/done answers), or
+    None when the input needs real extraction.
+    """
+    text = user_input.strip()
+    if _TRIVIAL_PATTERNS.fullmatch(text):
+        return {}
+    if _ISO_DATE.fullmatch(text):
+        return {"preferred_date": text}
+    if _CLOCK_TIME.fullmatch(text):
+        return {"preferred_time": text}
+    if _PHONE_NUMBER.fullmatch(text):
+        return {"patient_phone": text}
+    return None
+
 def identify_missing_info_logic(context: dict) -> list:
     """
     Identifies which REQUIRED appointment information is missing.
     Returns list of missing fields.
     """
-    # Only these fields are REQUIRED for booking
-    required_fields = ["doctor_specialty", "preferred_date", "preferred_time", "patient_name", "reason"]
-    missing = [field for field in required_fields if not context.get(field)]
-    return missing
+    return [field for field in REQUIRED_FIELDS if not context.get(field)]
+
+# Natural phrasing for each field we might have to ask about. With a
+# fixed field set the question space is tiny, so a template covers what
+# a full Ollama round-trip used to generate.
+_QUESTION_PHRASES = {
+    "doctor_specialty": "what kind of specialist you'd like to see",
+    "preferred_date": "what date works for you",
+    "preferred_time": "what time you'd prefer",
+    "patient_name": "the patient's name",
+    "patient_age": "the patient's age",
+    "patient_phone": "a contact phone number",
+    "reason": "the reason for the visit",
+    "symptoms": "any symptoms you're experiencing",
+}
+
 
 def generate_clarification_questions_logic(missing_fields: list) -> str:
     """
-    Generates user-friendly questions to collect missing information using Ollama.
+    Generates user-friendly questions to collect missing information.
     """
     if not missing_fields:
         return "All information collected!"
-    
-    # Create a more natural question asking for all missing fields at once
-    fields_text = ", ".join([f.replace("_", " ") for f in missing_fields])
-    
-    questions_prompt = f"""Generate 1-2 brief, natural follow-up questions to ask the user to get this missing information:
-{fields_text}
 
-Be conversational and helpful. Ask for all the missing information together if possible.
-Keep questions short and natural, as if talking to someone in person.
-Do not number the questions. Just ask naturally."""
-    
-    return call_ollama(questions_prompt)
+    phrases = [_QUESTION_PHRASES.get(f, f.replace("_", " ")) for f in missing_fields]
+    if len(phrases) == 1:
+        asked = phrases[0]
+    else:
+        asked = ", ".join(phrases[:-1]) + ", and " + phrases[-1]
+    return f"Could you tell me {asked}?"
 
 def build_appointment_prompt_logic(context: dict) -> str:
     """
     Builds a complete appointment booking prompt from all collected information using Ollama.
     """
-    context_str = json.dumps(context, indent=2)
+    # Compact separators: the indent=2 form added ~30% more prompt tokens
+    # for whitespace the model doesn't need.
+    context_str = json.dumps(context, separators=(",", ":"))
     build_prompt = f"""Based on this complete appointment information:
 {context_str}
 
@@ -187,64 +377,98 @@ Keep it professional and brief."""
 
 # ========== TOOL DEFINITIONS (for agent use) ==========
 
-@tool
-def extract_appointment_info(user_input: str) -> str:
-    """Extracts appointment-related information from user input."""
-    result = extract_appointment_info_logic(user_input)
-    return json.dumps(result)
-
-@tool
-def identify_missing_info(context: str) -> str:
-    """Identifies which appointment information is missing."""
-    try:
-        context_dict = json.loads(context)
-    except:
-        context_dict = {}
-    missing = identify_missing_info_logic(context_dict)
-    return json.dumps(missing)
-
-@tool
-def generate_clarification_questions(missing_fields: str) -> str:
-    """Generates questions to collect missing information."""
-    try:
-        fields = json.loads(missing_fields)
-    except:
-        fields = missing_fields.split(", ")
-    return generate_clarification_questions_logic(fields)
-
-@tool
-def build_appointment_prompt(context: str) -> str:
-    """Builds a complete appointment booking prompt."""
-    try:
-        context_dict = json.loads(context)
-    except:
-        context_dict = {}
-    return build_appointment_prompt_logic(context_dict)
+def get_tools():
+    """
+    Builds the LangChain tool wrappers for agent-framework consumers.
 
-@tool
-def mock_book_appointment(appointment_summary: str) -> str:
-    """Simulates booking an appointment."""
-    return mock_book_appointment_logic(appointment_summary)
+    langchain_core is imported lazily here — it drags in a large
+    dependency tree at import time, and the FastAPI/CLI paths call the
+    *_logic functions directly without ever needing it.
+    """
+    from langchain_core.tools import tool
+
+    @tool
+    def extract_appointment_info(user_input: str) -> str:
+        """Extracts appointment-related information from user input."""
+        result = extract_appointment_info_logic(user_input)
+        return json.dumps(result)
+
+    @tool
+    def identify_missing_info(context: str) -> str:
+        """Identifies which appointment information is missing."""
+        try:
+            context_dict = json.loads(context)
+        except:
+            context_dict = {}
+        missing = identify_missing_info_logic(context_dict)
+        return json.dumps(missing)
+
+    @tool
+    def generate_clarification_questions(missing_fields: str) -> str:
+        """Generates questions to collect missing information."""
+        try:
+            fields = json.loads(missing_fields)
+        except:
+            fields = missing_fields.split(", ")
+        return generate_clarification_questions_logic(fields)
+
+    @tool
+    def build_appointment_prompt(context: str) -> str:
+        """Builds a complete appointment booking prompt."""
+        try:
+            context_dict = json.loads(context)
+        except:
+            context_dict = {}
+        return build_appointment_prompt_logic(context_dict)
+
+    @tool
+    def mock_book_appointment(appointment_summary: str) -> str:
+        """Simulates booking an appointment."""
+        return mock_book_appointment_logic(appointment_summary)
+
+    return [
+        extract_appointment_info,
+        identify_missing_info,
+        generate_clarification_questions,
+        build_appointment_prompt,
+        mock_book_appointment,
+    ]
+
+def _normalize_symptoms(value) -> str:
+    """Collapse a symptoms value (string or list) into one comma-separated string."""
+    return ", ".join(value) if isinstance(value, list) else (value or "")
 
 def update_appointment_context(context: dict, extracted_info: dict) -> None:
     """
     Updates the provided appointment context with newly extracted information.
-    Only updates fields that have actual values (not null).
+    Only updates fields that have actual values (not null); symptoms
+    accumulate across turns instead of first-write-wins.
     """
     if not extracted_info:
         return
 
     for key in context:
+        if key == "symptoms":
+            continue
         # Only update if we have a new value and field is currently empty
         if extracted_info.get(key) and not context.get(key):
             context[key] = extracted_info[key]
 
-def process_appointment_booking(user_input: str, context: dict) -> dict:
+    new_symptoms = _normalize_symptoms(extracted_info.get("symptoms"))
+    if new_symptoms:
+        existing = _normalize_symptoms(context.get("symptoms"))
+        context["symptoms"] = f"{existing}, {new_symptoms}" if existing else new_symptoms
+
+async def process_appointment_booking(user_input: str, context: dict) -> dict:
     """
     Manages the appointment booking flow with interactive information gathering.
     """
-    # Step 1: Extract information from user input
-    extracted = extract_appointment_info_logic(user_input)
+    # Step 1: Extract information from user input. Trivial inputs (bare
+    # acknowledgements, dates, times, phone numbers) never reach the LLM.
+    extracted = classify_trivial_input(user_input)
+    if extracted is None:
+        extraction_response = await call_ollama_async(build_extraction_prompt(user_input), format="json")
+        extracted = parse_extraction_response(extraction_response)
 
     # Step 2: Update context with new information (only if not already set)
     update_appointment_context(context, extracted)
@@ -263,13 +487,19 @@ def process_appointment_booking(user_input: str, context: dict) -> dict:
         # Step 4: Generate clarification questions only for truly missing info
         questions = generate_clarification_questions_logic(missing_required)
 
-        collected_display = ""
+        # Assemble the message as a list of lines and join once — repeated
+        # `+=` on a str reallocates the whole string each iteration.
+        lines = []
         if collected_info:
-            collected_display = "✓ Information collected so far:\n"
-            for key, value in collected_info.items():
-                display_key = key.replace("_", " ").title()
-                collected_display += f"  • {display_key}: {value}\n"
-            collected_display += "\n"
+            lines.append("✓ Information collected so far:")
+            lines.extend(
+                f"  • {_DISPLAY_NAMES[key]}: {value}"
+                for key, value in collected_info.items()
+            )
+            lines.append("")
+        lines.append(f"Still need: {', '.join(_SPACED_NAMES[f] for f in missing_required)}")
+        lines.append("")
+        lines.append(questions)
 
         return {
             "status": "collecting_info",
@@ -277,7 +507,7 @@ def process_appointment_booking(user_input: str, context: dict) -> dict:
             "collected_info": collected_info,
             "missing_fields": missing_required,
             "questions": questions,
-            "message": f"{collected_display}Still need: {', '.join([f.replace('_', ' ') for f in missing_required])}\n\n{questions}"
+            "message": "\n".join(lines)
         }
     else:
         # Step 5: All required info collected - ask for additional symptoms
@@ -288,12 +518,12 @@ def process_appointment_booking(user_input: str, context: dict) -> dict:
             "message": "Great! I have all the required information.\n\nDo you have any additional symptoms or concerns you'd like to mention? (Type 'done' if nothing more to add)"
         }
 
-def process_user_input(user_input: str, context: dict) -> dict:
+async def process_user_input(user_input: str, context: dict) -> dict:
     """
     Main entry point for processing user input for appointment booking.
     """
     try:
-        result = process_appointment_booking(user_input, context)
+        result = await process_appointment_booking(user_input, context)
         return result
     except Exception as e:
         return {
@@ -302,11 +532,21 @@ def process_user_input(user_input: str, context: dict) -> dict:
         }
 
 def is_all_fields_filled(context: dict) -> bool:
-    """Check if all fields in a given appointment context are filled"""
-    return all(value is not None for value in context.values())
+    """Check if all required fields in a given appointment context are filled"""
+    # Checking every key gave a false negative whenever the optional
+    # patient_age/patient_phone were absent, forcing extra LLM turns to
+    # chase data booking doesn't need.
+    return all(context.get(field) is not None for field in REQUIRED_FIELDS)
 
 # Main function kept for optional CLI use
 def main():
+    # One asyncio.run for the whole session: a run per turn would tear
+    # down the event loop _OLLAMA_ASYNC's pooled connection is bound to,
+    # making every other generation fail with a closed loop.
+    asyncio.run(_main_loop())
+
+
+async def _main_loop():
     ctx = new_context()
     print("=" * 70)
     print("Doctor Appointment Booking Agent (CLI)")
@@ -324,24 +564,41 @@ def main():
             print("Please enter a valid input.\n")
             continue
 
-        result = process_user_input(user_input, ctx)
+        result = await process_user_input(user_input, ctx)
         print(result.get("message", result))
 
 
+@app.on_event("startup")
+async def warm_up_model():
+    # Pin the model in Ollama's memory before the first real request so
+    # it doesn't pay the full model-load cost (often 5-30s).
+    try:
+        await _OLLAMA_ASYNC.generate(
+            model=OLLAMA_MODEL,
+            prompt="ok",
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            options={"num_predict": 1},
+        )
+    except Exception as e:
+        print(f"Warning: Ollama warm-up failed: {e}")
+
+
 @app.post("/api/appointment/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest):
     # Create or retrieve session
     session_id = request.session_id or str(uuid.uuid4())
-    if session_id not in session_contexts:
-        session_contexts[session_id] = new_context()
-
-    ctx = session_contexts[session_id]
+    with _sessions_lock:
+        ctx = session_contexts.get(session_id)
+        if ctx is None:
+            ctx = new_context()
+            session_contexts[session_id] = ctx
 
-    result = process_user_input(request.user_input, ctx)
+    result = await process_user_input(request.user_input, ctx)
 
     # Reset if we reached final state and user said done/no in symptoms flow
     if result.get("status") == "ask_symptoms" and request.user_input.strip().lower() in {"done", "no"}:
-        session_contexts[session_id] = new_context()
+        with _sessions_lock:
+            session_contexts[session_id] = new_context()
 
     return ChatResponse(
         session_id=session_id,
@@ -354,11 +611,54 @@ def chat(request: ChatRequest):
     )
 
 
+@app.post("/api/appointment/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /api/appointment/chat. Sends SSE frames: an
+    immediate session acknowledgement (before the LLM runs), then a
+    metadata frame, then the message text, so the client can render
+    progress instead of waiting on the full extraction round-trip.
+    """
+    # Create or retrieve session
+    session_id = request.session_id or str(uuid.uuid4())
+    with _sessions_lock:
+        ctx = session_contexts.get(session_id)
+        if ctx is None:
+            ctx = new_context()
+            session_contexts[session_id] = ctx
+
+    async def event_stream():
+        # First frame goes out before any model work, giving the client
+        # a sub-millisecond acknowledgement to render against.
+        yield f"data: {json.dumps({'session_id': session_id, 'status': 'processing'})}\n\n"
+
+        result = await process_user_input(request.user_input, ctx)
+
+        # Reset if we reached final state and user said done/no in symptoms flow
+        if result.get("status") == "ask_symptoms" and request.user_input.strip().lower() in {"done", "no"}:
+            with _sessions_lock:
+                session_contexts[session_id] = new_context()
+
+        metadata = {
+            "session_id": session_id,
+            "status": result.get("status", "error"),
+            "collected_info": result.get("collected_info", {}),
+            "missing_fields": result.get("missing_fields"),
+        }
+        yield f"data: {json.dumps(metadata)}\n\n"
+        for line in result.get("message", "").splitlines():
+            yield f"data: {json.dumps({'message': line})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/api/appointment/reset")
 def reset_session(session_id: Optional[str] = None):
     if not session_id:
         raise HTTPException(status_code=400, detail="session_id is required")
-    session_contexts[session_id] = new_context()
+    with _sessions_lock:
+        session_contexts.pop(session_id, None)
     return {"status": "reset", "session_id": session_id}
 
 
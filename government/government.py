@@ -21,32 +21,49 @@ def build_queries(user):
         f"{user['state']} higher education scholarship official"
     ]
 
-def duckduckgo_scheme_search(user, max_results_per_query=10):
-    queries = build_queries(user)
-    aggregated = {}
-    
+def search_scheme_query(query, max_results=10):
+    """
+    Runs a single scheme query and returns its allowed-domain results.
+    Kept independent per query so callers can run queries in parallel.
+    """
+    results = []
+
     with DDGS() as ddgs:
-        for query in queries:
-            for r in ddgs.text(query, max_results=max_results_per_query):
-                url = r.get("href", "")
-                
-                if not url:
-                    continue
+        for r in ddgs.text(query, max_results=max_results):
+            url = r.get("href", "")
 
-                if not any(domain in url for domain in ALLOWED_DOMAINS):
-                    continue
+            if not url:
+                continue
 
-                # Deduplicate by URL
-                if url not in aggregated:
-                    aggregated[url] = {
-                        "title": r.get("title", ""),
-                        "url": url,
-                        "snippet": r.get("body", ""),
-                        "source_query": query
-                    }
+            if not any(domain in url for domain in ALLOWED_DOMAINS):
+                continue
 
+            results.append({
+                "title": r.get("title", ""),
+                "url": url,
+                "snippet": r.get("body", ""),
+                "source_query": query
+            })
+
+    return results
+
+def dedupe_by_url(result_lists):
+    """
+    Merges per-query result lists, keeping the first entry for each URL
+    """
+    aggregated = {}
+    for results in result_lists:
+        for entry in results:
+            if entry["url"] not in aggregated:
+                aggregated[entry["url"]] = entry
     return list(aggregated.values())
 
+def duckduckgo_scheme_search(user, max_results_per_query=10):
+    return dedupe_by_url(
+        search_scheme_query(query, max_results_per_query)
+        for query in build_queries(user)
+    )
+
 def duckduckgo_legal_search(issue, location, max_results=5):
     """
     Search for lawyers and legal advisors based on issue and location